@@ -7,9 +7,14 @@ from pptx.enum.shapes import MSO_SHAPE
 import io
 import re
 import textwrap
+import hashlib
+import uuid
 import docx
+import numpy as np
 from io import BytesIO
-from sentence_transformers import SentenceTransformer, util
+from sentence_transformers import util
+from model_store import load_shared_model
+from speculative import SpeculativePreprocessor
 
 # Streamlit 세팅
 st.set_page_config(page_title="Paydo AI PPT", layout="centered")
@@ -291,23 +296,35 @@ custom_css = """
 # Streamlit 앱에 사용자 정의 CSS 주입
 st.markdown(custom_css, unsafe_allow_html=True)
 
-# 모델 로딩 (한 번만)
+# 모델 로딩 (한 번만, safetensors mmap 으로 워커 간 가중치 공유)
 @st.cache_resource
 def load_model():
-    return SentenceTransformer("jhgan/ko-sbert-nli")
+    return load_shared_model()
 
 model = load_model()
 
+# 선행 처리 설정 (업로드/입력 직후 백그라운드에서 문장 분할 + 임베딩)
+SPECULATION_DEBOUNCE_SECONDS = 0.8
+SPECULATION_MAX_BYTES = 5 * 1024 * 1024  # 이보다 큰 입력(UTF-8 기준)은 버튼 클릭 시에만 처리하고 캐시하지 않음
+SPECULATION_CACHE_BYTES = 128 * 1024 * 1024  # 프로세스당 보관할 임베딩 총 크기
+ENCODE_BATCH_SIZE = 16  # 임베딩 배치 크기 (배치 사이마다 취소/일시정지 확인)
+
 # Word 파일 텍스트 추출
+def extract_paragraphs_from_docx(file_bytes):
+    doc = docx.Document(BytesIO(file_bytes))
+    return [p.text for p in doc.paragraphs if p.text.strip()]
+
 def extract_text_from_word(uploaded_file):
     try:
-        file_bytes = BytesIO(uploaded_file.read())
-        doc = docx.Document(file_bytes)
-        return [p.text for p in doc.paragraphs if p.text.strip()]
+        return extract_paragraphs_from_docx(uploaded_file.getvalue())
     except Exception as e:
         st.error(f"Word 파일 처리 오류: {e}")
         return None
 
+# 직접 입력한 텍스트를 문단으로 분리
+def split_text_input(text):
+    return [p.strip() for p in text.split("\n\n") if p.strip()]
+
 # 텍스트 줄 수 계산
 def calculate_text_lines(text, max_chars_per_line):
     lines = 0
@@ -358,18 +375,38 @@ def smart_sentence_split(text):
     return all_sentences
 
 
+# 문단별 문장 분할 + 임베딩 (슬라이드 설정과 무관하므로 미리 계산해 둘 수 있음)
+def preprocess_paragraphs(text_paragraphs, model, checkpoint=None):
+    preprocessed = []
+    for paragraph in text_paragraphs:
+        if checkpoint:
+            checkpoint()
+        sentences = smart_sentence_split(paragraph)
+        embeddings = None
+        if sentences:
+            # 긴 문단도 중간에 취소/일시정지할 수 있도록 고정 크기 배치로 나눠서 인코딩
+            batches = []
+            for start in range(0, len(sentences), ENCODE_BATCH_SIZE):
+                if checkpoint and start:
+                    checkpoint()
+                batches.append(model.encode(sentences[start:start + ENCODE_BATCH_SIZE], batch_size=ENCODE_BATCH_SIZE))
+            embeddings = np.concatenate(batches)
+        preprocessed.append((sentences, embeddings))
+    return preprocessed
+
+
 # 슬라이드 분할 with 유사도 + 짧은 문장 병합 개선
-def split_text_into_slides_with_similarity(text_paragraphs, max_lines_per_slide, max_chars_per_line_ppt, model, similarity_threshold=0.85):
+def split_text_into_slides_with_similarity(text_paragraphs, max_lines_per_slide, max_chars_per_line_ppt, model, similarity_threshold=0.85, preprocessed=None):
     slides, split_flags, slide_number = [], [], 1
     current_text, current_lines, needs_check = "", 0, False
 
-    for paragraph in text_paragraphs:
-        sentences = smart_sentence_split(paragraph)
+    if preprocessed is None:
+        preprocessed = preprocess_paragraphs(text_paragraphs, model)
+
+    for sentences, embeddings in preprocessed:
         if not sentences:
             continue
 
-        embeddings = model.encode(sentences)
-
         i = 0
         while i < len(sentences):
             sentence = sentences[i]
@@ -403,6 +440,47 @@ def split_text_into_slides_with_similarity(text_paragraphs, max_lines_per_slide,
 
     return slides, split_flags
 
+# 입력 내용 → (종류, 데이터) 페이로드. Word 파일이 있으면 우선 사용
+def build_script_payload(uploaded_file, text_input):
+    if uploaded_file is not None:
+        return ("docx", uploaded_file.getvalue())
+    if text_input.strip():
+        return ("text", text_input)
+    return None
+
+# 페이로드 내용 해시 (선행 처리 결과의 키)
+def payload_key(payload):
+    kind, data = payload
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return f"{kind}:{hashlib.sha256(data).hexdigest()}"
+
+# 페이로드 크기 (UTF-8 바이트 기준)
+def payload_size(payload):
+    kind, data = payload
+    return len(data.encode("utf-8")) if isinstance(data, str) else len(data)
+
+# 백그라운드 선행 처리 작업: 텍스트 추출 + 문장 분할 + 임베딩
+def preprocess_script(payload, checkpoint=None):
+    kind, data = payload
+    paragraphs = extract_paragraphs_from_docx(data) if kind == "docx" else split_text_input(data)
+    return paragraphs, preprocess_paragraphs(paragraphs, model, checkpoint)
+
+# 선행 처리 결과 크기 (임베딩 바이트 수)
+def preprocessed_size(result):
+    paragraphs, preprocessed = result
+    return sum(embeddings.nbytes for _, embeddings in preprocessed if embeddings is not None)
+
+# 선행 처리기 (프로세스당 하나, 작업 스레드 1개로 제한)
+@st.cache_resource
+def get_speculator():
+    return SpeculativePreprocessor(
+        preprocess_script, preprocessed_size, max_workers=1,
+        debounce_seconds=SPECULATION_DEBOUNCE_SECONDS, max_result_bytes=SPECULATION_CACHE_BYTES
+    )
+
+speculator = get_speculator()
+
 def create_ppt(slide_texts, split_flags, max_chars_per_line_in_ppt=18, font_size=54):
     prs = Presentation()
     prs.slide_width = Inches(13.33)
@@ -531,6 +609,14 @@ with tab2:
         help="여기에 입력된 텍스트로 PPT 대본이 생성됩니다."
     )
 
+# 업로드/입력이 끝나면 버튼을 누르기 전에 백그라운드에서 선행 처리 시작 (내용이 바뀌면 이전 작업 취소)
+speculation_owner = st.session_state.setdefault("speculation_owner", uuid.uuid4().hex)
+speculative_payload = build_script_payload(uploaded_file_tab1, text_input_tab2)
+if speculative_payload is not None and payload_size(speculative_payload) <= SPECULATION_MAX_BYTES:
+    speculator.submit(speculation_owner, payload_key(speculative_payload), speculative_payload)
+else:
+    speculator.release(speculation_owner)
+
 # 고정된 하단 바
 st.markdown('<div class="bottom-fixed-bar">', unsafe_allow_html=True) 
 
@@ -539,24 +625,38 @@ col1, col2, col3 = st.columns([1, 2, 1]) # 1:2:1 비율로 컬럼 생성 (가운
 with col2: # 가운데 컬럼에 버튼 배치
     if st.button("🚀 PPT 자동 생성 시작", use_container_width=True): # use_container_width=True를 사용하여 컬럼 너비에 맞춤
         paragraphs = []
-        target_file = None
-        target_text_input = ""
+        preprocessed = None
+        payload = build_script_payload(uploaded_file_tab1, text_input_tab2)
 
-        if uploaded_file_tab1 is not None:
-            paragraphs = extract_text_from_word(uploaded_file_tab1)
-        elif text_input_tab2.strip():
-            paragraphs = [p.strip() for p in text_input_tab2.split("\n\n") if p.strip()]
-        else:
+        if payload is None:
             st.warning("PPT 생성을 위해 Word 파일을 업로드하거나 대본을 직접 입력해주세요.")
             st.stop()
 
-        if not paragraphs:
-            st.error("유효한 텍스트가 없습니다.")
-            st.stop()
+        key = payload_key(payload)
 
         with st.spinner("PPT 생성 중..."):
+            # 진행 중인 선행 처리는 이어서 끝까지 기다리고, 시작 전이면 직접 처리
+            cached = speculator.get(speculation_owner, key)
+            if cached is not None:
+                paragraphs, preprocessed = cached
+            elif uploaded_file_tab1 is not None:
+                paragraphs = extract_text_from_word(uploaded_file_tab1)
+            else:
+                paragraphs = split_text_input(text_input_tab2)
+
+            if not paragraphs:
+                st.error("유효한 텍스트가 없습니다.")
+                st.stop()
+
+            if preprocessed is None:
+                # 실제 요청 처리 중에는 선행 작업이 멈춘다.
+                with speculator.foreground():
+                    preprocessed = preprocess_paragraphs(paragraphs, model)
+                if payload_size(payload) <= SPECULATION_MAX_BYTES:
+                    speculator.put(key, (paragraphs, preprocessed))
             slides, flags = split_text_into_slides_with_similarity(
-                paragraphs, max_lines, max_chars, model, similarity_threshold=sim_threshold
+                paragraphs, max_lines, max_chars, model, similarity_threshold=sim_threshold,
+                preprocessed=preprocessed
             )
             ppt = create_ppt(slides, flags, max_chars, font_size)
 
@@ -0,0 +1,97 @@
+"""워커 프로세스별 고유 메모리(USS) 측정 스크립트
+
+여러 Streamlit 워커를 흉내 내어 N개의 프로세스를 동시에 띄우고, 각각 모델을 로딩한 뒤
+/proc/self/smaps_rollup 에서 RSS / PSS / USS 를 읽어 비교한다. (Linux 전용)
+
+    python measure_model_memory.py --workers 4
+
+- baseline: 기존 방식 (SentenceTransformer 로 허브 모델을 각 프로세스 힙에 로딩)
+- mmap:     model_store.load_shared_model (safetensors 읽기 전용 mmap 공유)
+"""
+import argparse
+import multiprocessing as mp
+import queue
+import time
+
+
+def read_memory_kb():
+    """현재 프로세스의 RSS, PSS, USS(Private_Clean + Private_Dirty)를 KB 단위로 반환"""
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":"):
+                values[parts[0][:-1]] = int(parts[1]) if parts[1].isdigit() else 0
+    uss = values.get("Private_Clean", 0) + values.get("Private_Dirty", 0)
+    return {"rss": values.get("Rss", 0), "pss": values.get("Pss", 0), "uss": uss}
+
+
+def worker(mode, loaded, measured, results):
+    if mode == "mmap":
+        from model_store import load_shared_model
+        model = load_shared_model()
+    else:
+        from sentence_transformers import SentenceTransformer
+        from model_store import MODEL_NAME
+        model = SentenceTransformer(MODEL_NAME, device="cpu")
+    model.encode(["메모리 측정을 위한 문장입니다."])
+
+    # 모든 워커가 모델을 올린 상태에서 측정해야 공유 페이지가 USS 에서 빠진다.
+    loaded.wait()
+    results.put(read_memory_kb())
+    measured.wait()
+
+
+def measure(mode, workers, timeout):
+    ctx = mp.get_context("spawn")
+    # 워커 하나가 죽으면 나머지는 barrier 시간 초과(BrokenBarrierError)로 종료된다.
+    loaded, measured = ctx.Barrier(workers, timeout=timeout), ctx.Barrier(workers, timeout=timeout)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(mode, loaded, measured, results)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+
+    samples = []
+    deadline = time.monotonic() + timeout
+    try:
+        while len(samples) < workers:
+            try:
+                samples.append(results.get(timeout=1))
+            except queue.Empty:
+                failed = [p.exitcode for p in procs if p.exitcode not in (None, 0)]
+                if failed:
+                    raise RuntimeError(f"{mode}: 워커가 비정상 종료되었습니다 (exitcode {failed})")
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"{mode}: {timeout}초 안에 측정이 끝나지 않았습니다")
+    finally:
+        for p in procs:
+            p.join(timeout=timeout if len(samples) == workers else 0)
+            if p.is_alive():
+                p.terminate()
+                p.join()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4, help="동시에 띄울 워커 프로세스 수")
+    parser.add_argument("--mode", choices=["baseline", "mmap", "both"], default="both")
+    parser.add_argument("--timeout", type=float, default=600, help="모델 로딩/측정 대기 시간(초)")
+    args = parser.parse_args()
+
+    if args.mode in ("mmap", "both"):
+        # 변환은 측정 전에 한 번만 수행한다.
+        from model_store import convert_model_to_safetensors
+        convert_model_to_safetensors()
+
+    modes = ["baseline", "mmap"] if args.mode == "both" else [args.mode]
+    print(f"{'mode':<10}{'workers':>8}{'avg RSS MB':>12}{'avg PSS MB':>12}{'avg USS MB':>12}{'total USS MB':>14}")
+    for mode in modes:
+        samples = measure(mode, args.workers, args.timeout)
+        avg = {k: sum(s[k] for s in samples) / len(samples) / 1024 for k in ("rss", "pss", "uss")}
+        total_uss = sum(s["uss"] for s in samples) / 1024
+        print(f"{mode:<10}{args.workers:>8}{avg['rss']:>12.1f}{avg['pss']:>12.1f}{avg['uss']:>12.1f}{total_uss:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
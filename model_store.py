@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+
+from safetensors.torch import load_file
+from sentence_transformers import SentenceTransformer
+
+WEIGHTS_FILE = "model.safetensors"
+SOURCE_FILE = "source_model.txt"  # 변환에 사용한 원본 모델 이름
+
+
+def default_model_dir(model_name):
+    """모델 이름별 변환 디렉터리 (models/<이름의 / 를 -- 로 바꾼 값>)"""
+    return os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "models", model_name.strip("/").replace("/", "--")
+    )
+
+
+# 기본 모델 및 변환된 가중치 저장 위치 (환경 변수로 변경 가능)
+MODEL_NAME = os.environ.get("PAYDO_MODEL_NAME", "jhgan/ko-sbert-nli")
+MODEL_DIR = os.environ.get("PAYDO_MODEL_DIR", default_model_dir(MODEL_NAME))
+
+
+def _converted_source(model_dir):
+    try:
+        with open(os.path.join(model_dir, SOURCE_FILE), encoding="utf-8") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def convert_model_to_safetensors(model_name=MODEL_NAME, model_dir=None):
+    """모델을 한 번만 safetensors 형식으로 변환해 로컬 디렉터리에 저장하는 함수
+
+    여러 워커가 동시에 시작해도 안전하도록 임시 디렉터리에 저장한 뒤
+    rename 으로 한 번에 교체한다. 이미 같은 모델로 변환되어 있으면 아무것도 하지 않고,
+    다른 모델로 변환된 디렉터리라면 오류를 낸다.
+    """
+    if model_dir is None:
+        model_dir = MODEL_DIR if model_name == MODEL_NAME else default_model_dir(model_name)
+
+    if os.path.isfile(os.path.join(model_dir, WEIGHTS_FILE)):
+        source = _converted_source(model_dir)
+        if source != model_name:
+            raise RuntimeError(
+                f"{model_dir} 는 다른 모델({source})로 변환되어 있습니다. "
+                f"{model_name} 을(를) 사용하려면 디렉터리를 지우거나 PAYDO_MODEL_DIR 을 바꿔주세요."
+            )
+        return model_dir
+
+    parent = os.path.dirname(model_dir)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=".convert-", dir=parent)
+    try:
+        model = SentenceTransformer(model_name, device="cpu")
+        model.save(tmp_dir, safe_serialization=True)
+        if not os.path.isfile(os.path.join(tmp_dir, WEIGHTS_FILE)):
+            raise RuntimeError(f"safetensors 가중치가 생성되지 않았습니다: {tmp_dir}")
+        with open(os.path.join(tmp_dir, SOURCE_FILE), "w", encoding="utf-8") as f:
+            f.write(model_name)
+        try:
+            os.rename(tmp_dir, model_dir)
+        except OSError:
+            # 다른 워커가 먼저 변환을 끝낸 경우
+            if _converted_source(model_dir) != model_name:
+                raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return model_dir
+
+
+def load_shared_model(model_name=MODEL_NAME, model_dir=None):
+    """safetensors 가중치를 읽기 전용 mmap 으로 연결해 모델을 로딩하는 함수
+
+    safetensors 는 CPU 텐서를 파일의 MAP_PRIVATE 매핑 위에 바로 만들기 때문에,
+    load_state_dict(assign=True) 로 파라미터를 교체하면 가중치가 힙으로 복사되지 않는다.
+    추론 중에는 가중치를 쓰지 않으므로 같은 호스트의 모든 워커 프로세스가
+    OS 페이지 캐시에 있는 하나의 물리 사본을 공유하게 된다.
+    """
+    model_dir = convert_model_to_safetensors(model_name, model_dir)
+
+    model = SentenceTransformer(model_dir, device="cpu")
+    transformer = model[0].auto_model
+    state_dict = load_file(os.path.join(model_dir, WEIGHTS_FILE), device="cpu")
+    missing, unexpected = transformer.load_state_dict(state_dict, strict=False, assign=True)
+    if unexpected:
+        raise RuntimeError(f"모델 구조와 맞지 않는 가중치가 있습니다: {unexpected}")
+    # 파일에 저장되지 않는 버퍼(embeddings.position_ids 등)만 허용. 그 외 누락된 가중치는
+    # 힙 사본으로 남아 공유되지 않으므로 오류로 처리한다.
+    non_persistent = {
+        f"{name}.{buffer}" if name else buffer
+        for name, module in transformer.named_modules()
+        for buffer in module._non_persistent_buffers_set
+    }
+    missing = [key for key in missing if key not in non_persistent]
+    if missing:
+        raise RuntimeError(f"safetensors 파일에 없는 가중치가 있습니다: {missing}")
+    # 로딩 과정에서 만들어진 힙 사본은 여기서 참조가 끊겨 해제된다.
+    model.eval()
+    return model
@@ -0,0 +1,214 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class SpeculationCancelled(Exception):
+    """취소된 선행 작업을 중단시키기 위한 예외"""
+
+
+class _Job:
+    def __init__(self, key, payload):
+        self.key = key
+        self.payload = payload
+        self.owners = set()
+        self.cancel_event = threading.Event()
+        self.timer = None
+        self.future = None
+        self.promoted = False
+
+
+class SpeculativePreprocessor:
+    """업로드/입력 직후 전처리를 백그라운드에서 미리 실행하고 결과를 내용 해시로 보관하는 클래스
+
+    - 같은 세션(owner)이 새 내용을 제출하면 이전 작업은 취소된다. (소유자가 없는 작업만 취소)
+    - owner_ttl 동안 submit/get 이 없는 세션(닫힌 탭 등)은 만료되어 그 세션의 작업도 정리된다.
+    - debounce_seconds 동안 내용이 바뀌지 않아야 실제 작업이 시작된다.
+    - 작업 스레드 수(max_workers)와 보관 결과의 총 크기(max_result_bytes, size_fn 기준)를 제한한다.
+    - foreground() 구간(실제 PPT 생성 요청)이 진행 중이면 선행 작업은 checkpoint 에서 멈춘다.
+      단, get() 으로 사용자가 기다리기 시작한 작업은 실제 요청으로 승격되어 멈추지 않는다.
+
+    work_fn(payload, checkpoint) 는 중간중간 checkpoint() 를 호출해야 취소/일시정지가 적용된다.
+    """
+
+    def __init__(self, work_fn, size_fn, max_workers=1, debounce_seconds=0.8,
+                 max_result_bytes=128 * 1024 * 1024, owner_ttl=300):
+        self._work_fn = work_fn
+        self._size_fn = size_fn
+        self._debounce_seconds = debounce_seconds
+        self._max_result_bytes = max_result_bytes
+        self._owner_ttl = owner_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="speculative")
+        self._lock = threading.Lock()
+        self._foreground_done = threading.Condition(self._lock)
+        self._foreground_count = 0
+        self._jobs = {}
+        self._results = OrderedDict()
+        self._result_sizes = {}
+        self._result_bytes = 0
+        self._owner_keys = {}
+        self._owner_seen = {}
+
+    def submit(self, owner, key, payload):
+        """owner 의 현재 내용을 선행 처리 대상으로 등록 (매 실행마다 호출되어 heartbeat 역할도 함)"""
+        with self._lock:
+            self._touch_locked(owner)
+            previous_key = self._owner_keys.get(owner)
+            if previous_key == key:
+                return
+            if previous_key is not None:
+                self._release_locked(owner, previous_key)
+            self._owner_keys[owner] = key
+
+            if key in self._results:
+                self._results.move_to_end(key)
+                return
+            job = self._jobs.get(key)
+            if job is None:
+                job = _Job(key, payload)
+                job.timer = threading.Timer(self._debounce_seconds, self._start, args=(job,))
+                job.timer.daemon = True
+                self._jobs[key] = job
+                job.timer.start()
+            job.owners.add(owner)
+
+    def release(self, owner):
+        """owner 가 더 이상 기다리지 않는 선행 작업을 정리"""
+        with self._lock:
+            self._owner_seen.pop(owner, None)
+            key = self._owner_keys.pop(owner, None)
+            if key is not None:
+                self._release_locked(owner, key)
+            self._expire_owners_locked()
+
+    def get(self, owner, key):
+        """완료된 결과를 반환. 실행 중이면 일시정지 없이 끝까지 기다리고, 결과가 없으면 None 반환
+
+        실행 중인 작업은 이미 진행된 만큼을 버리지 않도록 실제 요청으로 승격해 기다린다.
+        시작 전인 작업은 owner 만 기다리고 있을 때에만 취소한다.
+        """
+        with self._lock:
+            self._touch_locked(owner)
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+            job = self._jobs.get(key)
+            if job is None:
+                return None
+            future = job.future
+            if future is None or not (future.running() or future.done()):
+                # 시작 전인 작업은 호출한 쪽에서 바로 처리한다.
+                self._cancel_if_sole_owner_locked(owner, job)
+                return None
+            # 기다리는 동안 다른 세션이 떠나도 취소되지 않도록 owner 로 등록
+            job.owners.add(owner)
+            job.promoted = True
+            self._foreground_done.notify_all()
+        try:
+            return future.result()
+        except CancelledError:
+            return None
+
+    def put(self, key, result):
+        """실제 요청에서 계산한 결과도 같은 캐시에 저장"""
+        with self._lock:
+            self._store_locked(key, result)
+
+    @contextmanager
+    def foreground(self):
+        """실제 요청이 진행되는 동안 선행 작업을 일시정지"""
+        with self._lock:
+            self._foreground_count += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._foreground_count -= 1
+                if self._foreground_count == 0:
+                    self._foreground_done.notify_all()
+
+    def _start(self, job):
+        with self._lock:
+            if job.cancel_event.is_set():
+                return
+            job.future = self._executor.submit(self._run, job)
+
+    def _run(self, job):
+        def checkpoint():
+            with self._lock:
+                # 다른 세션의 요청이 없어도 닫힌 세션의 작업이 끝까지 돌지 않도록 여기서도 만료 처리
+                self._expire_owners_locked()
+                while self._foreground_count and not job.promoted and not job.cancel_event.is_set():
+                    self._foreground_done.wait()
+            if job.cancel_event.is_set():
+                raise SpeculationCancelled()
+
+        try:
+            checkpoint()
+            result = self._work_fn(job.payload, checkpoint)
+        except SpeculationCancelled:
+            result = None
+        except Exception:
+            logger.exception("선행 처리 실패: %s", job.key)
+            result = None
+
+        with self._lock:
+            if self._jobs.get(job.key) is job:
+                del self._jobs[job.key]
+            if result is not None and not job.cancel_event.is_set():
+                self._store_locked(job.key, result)
+        return result
+
+    def _touch_locked(self, owner):
+        self._owner_seen[owner] = time.monotonic()
+        self._expire_owners_locked()
+
+    def _expire_owners_locked(self):
+        deadline = time.monotonic() - self._owner_ttl
+        for owner, seen in list(self._owner_seen.items()):
+            if seen < deadline:
+                del self._owner_seen[owner]
+                key = self._owner_keys.pop(owner, None)
+                if key is not None:
+                    self._release_locked(owner, key)
+
+    def _release_locked(self, owner, key):
+        job = self._jobs.get(key)
+        if job is None:
+            return
+        job.owners.discard(owner)
+        if not job.owners:
+            self._cancel_locked(job)
+
+    def _cancel_if_sole_owner_locked(self, owner, job):
+        if job.owners <= {owner}:
+            self._cancel_locked(job)
+
+    def _cancel_locked(self, job):
+        job.cancel_event.set()
+        job.timer.cancel()
+        if job.future is not None:
+            job.future.cancel()
+        if self._jobs.get(job.key) is job:
+            del self._jobs[job.key]
+        # checkpoint 에서 대기 중인 작업도 깨워서 종료시킨다.
+        self._foreground_done.notify_all()
+
+    def _store_locked(self, key, result):
+        size = self._size_fn(result)
+        if size > self._max_result_bytes:
+            return
+        if key in self._results:
+            self._result_bytes -= self._result_sizes[key]
+        self._results[key] = result
+        self._result_sizes[key] = size
+        self._result_bytes += size
+        self._results.move_to_end(key)
+        while self._result_bytes > self._max_result_bytes:
+            old_key, _ = self._results.popitem(last=False)
+            self._result_bytes -= self._result_sizes.pop(old_key)
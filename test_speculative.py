@@ -0,0 +1,126 @@
+import threading
+import time
+
+from speculative import SpeculativePreprocessor
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class StubWork:
+    """checkpoint() 를 반복 호출하며 release 이벤트가 설정될 때까지 실행되는 작업"""
+
+    def __init__(self):
+        self.started = {}
+        self.finished = []
+        self.cancelled = []
+        self.checkpoints = 0
+        self.release = threading.Event()
+
+    def __call__(self, payload, checkpoint):
+        self.started.setdefault(payload, threading.Event()).set()
+        try:
+            while not self.release.is_set():
+                checkpoint()
+                self.checkpoints += 1
+                time.sleep(0.01)
+            checkpoint()
+        except Exception:
+            self.cancelled.append(payload)
+            raise
+        self.finished.append(payload)
+        return payload.upper()
+
+    def wait_started(self, payload):
+        return wait_until(lambda: payload in self.started)
+
+
+def make_speculator(work, **kwargs):
+    kwargs.setdefault("debounce_seconds", 0.01)
+    return SpeculativePreprocessor(work, lambda result: len(result), **kwargs)
+
+
+def test_superseded_job_is_cancelled():
+    work = StubWork()
+    speculator = make_speculator(work)
+    speculator.submit("a", "k1", "first")
+    assert work.wait_started("first")
+
+    speculator.submit("a", "k2", "second")
+    assert wait_until(lambda: "first" in work.cancelled)
+    work.release.set()
+
+    assert wait_until(lambda: "second" in work.finished)
+    assert speculator.get("a", "k2") == "SECOND"
+    assert speculator.get("a", "k1") is None
+
+
+def test_shared_job_survives_one_release():
+    work = StubWork()
+    speculator = make_speculator(work)
+    speculator.submit("a", "k", "shared")
+    speculator.submit("b", "k", "shared")
+    assert work.wait_started("shared")
+
+    speculator.release("a")
+    work.release.set()
+
+    assert speculator.get("b", "k") == "SHARED"
+    assert work.cancelled == []
+
+
+def test_paused_job_exits_on_cancel():
+    work = StubWork()
+    speculator = make_speculator(work)
+    speculator.submit("a", "k", "paused")
+    assert work.wait_started("paused")
+
+    with speculator.foreground():
+        time.sleep(0.05)
+        count = work.checkpoints
+        time.sleep(0.1)
+        assert work.checkpoints == count
+
+        speculator.release("a")
+        assert wait_until(lambda: "paused" in work.cancelled)
+    assert speculator.get("a", "k") is None
+
+
+def test_waiting_on_running_job_lifts_pause():
+    work = StubWork()
+    speculator = make_speculator(work)
+    speculator.submit("a", "k", "waited")
+    assert work.wait_started("waited")
+
+    with speculator.foreground():
+        threading.Timer(0.1, work.release.set).start()
+        assert speculator.get("a", "k") == "WAITED"
+
+
+def test_expired_owner_job_is_cancelled():
+    work = StubWork()
+    speculator = make_speculator(work, owner_ttl=0.1)
+    speculator.submit("a", "k", "abandoned")
+    assert work.wait_started("abandoned")
+
+    assert wait_until(lambda: "abandoned" in work.cancelled)
+    assert speculator._owner_keys == {}
+    assert speculator._owner_seen == {}
+
+
+def test_eviction_keeps_total_bytes_under_limit():
+    speculator = make_speculator(StubWork(), max_result_bytes=10)
+    speculator.put("k1", "aaaa")
+    speculator.put("k2", "bbbb")
+    speculator.put("k3", "cccc")
+    speculator.put("too-big", "x" * 11)
+
+    assert list(speculator._results) == ["k2", "k3"]
+    assert speculator._result_bytes == 8 <= 10
+    assert speculator.get("a", "too-big") is None